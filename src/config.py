@@ -26,6 +26,8 @@ ENV_PATH = os.path.join(MAIN_PATH, ".env")
 # GOOGLE SHEETS CONFIGURATION
 # ==============================================================
 UPDATED_WORKSHEET = "Rekomendasi Manual KM Master"
+TOKEN_REFRESH_THRESHOLD = 225   # in seconds, mirrors google-auth's REFRESH_THRESHOLD (token treated as invalid this long before expiry)
+TOKEN_STALE_WINDOW = 60         # in seconds, refresh access token in background before TOKEN_REFRESH_THRESHOLD is reached
 
 # ==============================================================
 # DATA PREPROCESSING CONFIGURATION
@@ -8,10 +8,7 @@ import pandas as pd
 import config
 import logging   
 
-# set up logging
-logging.basicConfig(
-    level=config.LOG_LEVEL, format=config.LOG_FORMAT
-) # get override from utils.py later (force=True)
+# module logger, configured once by utils.setup_logging()
 logger = logging.getLogger(__name__)
 
 def convert_to_op_code(
@@ -275,9 +272,12 @@ def correct_scientific_notation(
   return df
 
 if __name__ == "__main__":
+  from utils import setup_logging
   from dotenv import load_dotenv
   import os
 
+  setup_logging()
+
   # get environment variables
   env_path = os.path.join(os.path.dirname(__file__), "..", ".env")
   load_dotenv(env_path)
@@ -1,20 +1,165 @@
 """
 Authorize Google Sheets API for KM Master Discrepancy Detection System
+Logging is configured by utils.setup_logging(), call it before using this module
 """
 
 from utils import mask_numeric_value
 import config
 import gspread
 from google.oauth2.service_account import Credentials
+from google.auth.transport.requests import Request
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import pandas as pd
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
-# set up logging
-logging.basicConfig(
-    level=config.LOG_LEVEL, format=config.LOG_FORMAT
-) # get override from utils.py later (force=True)
+# module logger, configured once by utils.setup_logging()
 logger = logging.getLogger(__name__)
 
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+# single refresh worker shared by all cached clients, so evicted clients leave no threads behind
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-refresh")
+
+class PreemptiveCreds:
+    def __init__(
+        self, creds:Credentials,
+        stale_window:float = config.TOKEN_STALE_WINDOW
+    ) -> None:
+        '''
+        Wrap service account credentials to refresh the access token in the background before it expires.
+
+        Parameters:
+        -----------
+        creds : Credentials
+            Service account credentials to wrap.
+        stale_window : float
+            Seconds before google-auth treats the token as invalid at which a background refresh is triggered.
+        '''
+        self.creds = creds
+        self.stale_window = timedelta(seconds=stale_window)
+        self.refresh_threshold = timedelta(seconds=config.TOKEN_REFRESH_THRESHOLD)
+        self._lock = threading.Lock() # guards the in-flight background refresh state
+        self._refresh_lock = threading.Lock() # single-flight guard around creds.refresh
+        self._refreshing = None # future of the in-flight background refresh
+
+    def __getattr__(self, name:str):
+        # delegate everything else (token, expiry, valid, ...) to the wrapped credentials
+        return getattr(self.creds, name)
+
+    def _is_stale(self) -> bool:
+        # google-auth stores expiry as naive UTC
+        if self.creds.expiry is None:
+            return False
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        # creds.valid turns False TOKEN_REFRESH_THRESHOLD before expiry, so the stale window must open before that
+        return self.creds.expiry - now < self.refresh_threshold + self.stale_window
+
+    def _background_refresh(self) -> None:
+        try:
+            with self._refresh_lock:
+                # skip if an inline refresh already replaced the token
+                if self._is_stale():
+                    self.creds.refresh(Request())
+                    logger.info("Access token refreshed in background")
+        except Exception:
+            logger.exception("Background access token refresh failed")
+        finally:
+            with self._lock:
+                self._refreshing = None
+
+    def refresh(self, request) -> None:
+        '''
+        Refresh the access token synchronously (used when the token is rejected).
+        '''
+        token = self.creds.token
+        with self._refresh_lock:
+            # another thread already replaced the rejected token while we waited
+            if self.creds.valid and self.creds.token != token:
+                return
+            self.creds.refresh(request)
+
+    def get_metadata(self) -> dict:
+        '''
+        Return authorization headers, scheduling a single background refresh once the token is stale.
+
+        Returns:
+        --------
+        dict
+            Headers containing the current bearer token.
+        '''
+        # no usable token yet (first call or already expired): refresh inline
+        if not self.creds.valid:
+            with self._refresh_lock:
+                # re-check, another thread may have refreshed while we waited
+                if not self.creds.valid:
+                    self.creds.refresh(Request())
+        # token still valid but close to expiry: refresh once in background
+        elif self._is_stale():
+            with self._lock:
+                if self._refreshing is None:
+                    self._refreshing = _refresh_executor.submit(self._background_refresh)
+
+        headers = {}
+        self.creds.apply(headers)
+        return headers
+
+    def before_request(self, request, method:str, url:str, headers:dict) -> None:
+        # hook called by google.auth AuthorizedSession before every request
+        headers.update(self.get_metadata())
+
+# guard client cache population so concurrent callers authorize only once
+_client_lock = threading.Lock()
+
+@lru_cache(maxsize=4)
+def _authorize_client(credentials_path:str) -> gspread.Client:
+    """
+    Load service account credentials and authorize a gspread client (cached per credentials path).
+    """
+    creds = Credentials.from_service_account_file(credentials_path, scopes=SCOPES)
+    logger.info("Credentials loaded successfully")
+
+    client = gspread.authorize(creds)
+    logger.info("Google Sheets API authorized")
+
+    # swap in preemptive credentials so token refresh never stalls a sheet call
+    preemptive_creds = PreemptiveCreds(creds)
+    http_client = getattr(client, "http_client", client) # gspread>=6 keeps auth/session on http_client
+    http_client.auth = preemptive_creds
+    http_client.session.credentials = preemptive_creds
+
+    # keep connections to the Sheets API warm across calls, retry transient errors
+    http_client.session.mount("https://", HTTPAdapter(
+        pool_connections=8, pool_maxsize=32,
+        max_retries=Retry(
+            total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False # hand the final error response to gspread (APIError)
+        )
+    ))
+
+    return client
+
+def _get_client(credentials_path:str) -> gspread.Client:
+    """
+    Return the cached authorized gspread client for the given credentials path.
+
+    Parameters:
+    -----------
+    credentials_path: str
+        Path to credentials.json file.
+
+    Returns:
+    --------
+    gspread.Client
+        Authorized gspread client.
+    """
+    with _client_lock:
+        return _authorize_client(credentials_path)
+
 def sheets_loader(
     sheets_url:str, credentials_path:str = config.CREDENTIALS_PATH,
     hide_values:bool = config.HIDE_VALUES
@@ -38,23 +183,50 @@ def sheets_loader(
     """
     # hide values if configured
     if hide_values:
-        logger.info(f"Loading Google Sheets from URL: {sheets_url[:30]} [Redacted]...") # for privacy, only show part of the URL
+        logger.info("Loading Google Sheets from URL: %s [Redacted]...", sheets_url[:30]) # for privacy, only show part of the URL
     else:
-        logger.info(f"Loading Google Sheets from URL: {sheets_url} ...") 
-    
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
+        logger.info("Loading Google Sheets from URL: %s ...", sheets_url)
 
-    creds = Credentials.from_service_account_file(credentials_path, scopes=scopes)
-    logger.info("Credentials loaded successfully")
-
-    client = gspread.authorize(creds)
-    logger.info("Google Sheets API authorized")
-
-    sheets = client.open_by_url(sheets_url)
+    sheets = _get_client(credentials_path).open_by_url(sheets_url)
     logger.info("Sheet opened successfully")
     
     return sheets
 
+def sheets_loader_many(
+    sheets_urls:list, credentials_path:str = config.CREDENTIALS_PATH,
+    hide_values:bool = config.HIDE_VALUES,
+    max_workers:int = 8
+) -> list:
+    """
+    Open several Google Sheets concurrently with the shared authorized client.
+    
+    Parameters:
+    -----------
+    sheets_urls: list
+        URLs of the Google Sheets.
+    credentials_path: str
+        Path to credentials.json file.
+    hide_values : bool
+        Whether to hide numeric values in logs.
+    max_workers : int
+        Maximum number of sheets opened at the same time.
+    
+    Returns:
+    --------
+    list
+        gspread.Spreadsheet objects in the same order as sheets_urls.
+    """
+    if not sheets_urls:
+        return []
+
+    # authorize once up front so workers only open sheets
+    _get_client(credentials_path)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sheets_urls))) as executor:
+        return list(executor.map(
+            lambda url: sheets_loader(url, credentials_path, hide_values), sheets_urls
+        ))
+
 def sheets_updater(
     sheets_url:str, df:pd.DataFrame, 
     worksheet:str = config.UPDATED_WORKSHEET, 
@@ -77,19 +249,11 @@ def sheets_updater(
     """
     # hide values if configured
     if hide_values:
-        logger.info(f"Loading Google Sheets for update from URL: {sheets_url[:30]} [Redacted]...") # for privacy, only show part of the URL
+        logger.info("Loading Google Sheets for update from URL: %s [Redacted]...", sheets_url[:30]) # for privacy, only show part of the URL
     else:
-        logger.info(f"Loading Google Sheets for update from URL: {sheets_url} ...") 
-    
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-
-    creds = Credentials.from_service_account_file(credentials_path, scopes=scopes)
-    logger.info("Credentials loaded successfully")
+        logger.info("Loading Google Sheets for update from URL: %s ...", sheets_url)
 
-    client = gspread.authorize(creds)
-    logger.info("Google Sheets API authorized with edit access")
-
-    sheets = client.open_by_url(sheets_url)
+    sheets = _get_client(credentials_path).open_by_url(sheets_url)
     logger.info("Sheet opened successfully")
 
     sheets = sheets.worksheet(worksheet)
@@ -100,9 +264,12 @@ def sheets_updater(
     logger.info(f"Update {mask_numeric_value(f'{len(df):,}')} rows to worksheet '{worksheet}'.")
 
 if __name__ == "__main__":
+    from utils import setup_logging
     import os
     from dotenv import load_dotenv
 
+    setup_logging()
+
     # get environment variables
     env_path = os.path.join(os.path.dirname(__file__), "..", ".env")
     load_dotenv(env_path)
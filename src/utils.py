@@ -3,22 +3,38 @@ Utility functions for KM Master Discrepancy Detection System
 Contains setup logging and repetitive helper functions for analysis and visualization
 """
 
+from __future__ import annotations
+
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import sys
 import config
-import pandas as pd
 import time
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
-from matplotlib.lines import Line2D
-from matplotlib.patches import Patch
-import seaborn as sns
-
-# setup logging
-logging.basicConfig(
-    level=config.LOG_LEVEL, format=config.LOG_FORMAT
-) # get override from utils.py later (force=True)
+from array import array
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+# pandas, numpy, and plotting libraries are imported lazily inside the functions that need them,
+# so importing utils for setup_logging or mask_numeric_value stays cheap
+if TYPE_CHECKING:
+    import pandas as pd
+
+# module logger, configured once by setup_logging()
 logger = logging.getLogger(__name__)
 
+# background listener writing queued records to the log file (see setup_logging)
+_log_listener = None
+_log_file_handler = None # reused across setup_logging calls while the path is unchanged
+_ensured_dirs = set() # log directories already created
+
+# console summary banners (built once)
+_EQ = "=" * 70
+_DASH = "-" * 70
+_BOLD, _RESET = '\033[1m', '\033[0m'
+
 def setup_logging(
     log_file_path:str = config.LOGS_PATH, 
     log_level:int = config.LOG_LEVEL,
@@ -39,13 +55,41 @@ def setup_logging(
     log_date_format : str
         Format of the date in log messages.
     """
+    global _log_listener, _log_file_handler
+
+    # stop file listener from a previous setup (e.g. re-run notebook cell), keep its file open
+    _stop_log_listener(close_file=False)
+
     # configure logging
     handlers = [logging.StreamHandler()] # console handler
 
     if log_file_path: # if log file path is provided
-        import os
-        os.makedirs(os.path.dirname(log_file_path), exist_ok=True) # create directory if not exists
-        handlers.append(logging.FileHandler(log_file_path)) # add file handler
+        log_dir = os.path.dirname(log_file_path)
+        if log_dir and log_dir not in _ensured_dirs:
+            os.makedirs(log_dir, exist_ok=True) # create directory if not exists
+            _ensured_dirs.add(log_dir)
+
+        # reuse the open file handler if the path is unchanged
+        if (
+            _log_file_handler is not None
+            and _log_file_handler.baseFilename != os.path.abspath(log_file_path)
+        ):
+            _log_file_handler.close()
+            _log_file_handler = None
+        if _log_file_handler is None:
+            # records arrive already formatted by the queue handler
+            _log_file_handler = logging.FileHandler(log_file_path)
+
+        # file writes happen on a background thread, callers only enqueue records
+        log_queue = queue.Queue(-1)
+        handlers.append(logging.handlers.QueueHandler(log_queue)) # add queue handler
+        _log_listener = logging.handlers.QueueListener(
+            log_queue, _log_file_handler, respect_handler_level=True
+        )
+        _log_listener.start()
+    elif _log_file_handler is not None:
+        _log_file_handler.close()
+        _log_file_handler = None
     
     logging.basicConfig(
         level=log_level,
@@ -55,6 +99,42 @@ def setup_logging(
         force=True # force=True to override any existing logging configuration
     )
 
+@atexit.register
+def _stop_log_listener(close_file:bool = True) -> None:
+    '''
+    Flush queued log records and stop the file listener.
+
+    Parameters:
+    -----------
+    close_file : bool
+        Whether to also close the log file handler.
+    '''
+    global _log_listener, _log_file_handler
+
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+    if close_file and _log_file_handler is not None:
+        _log_file_handler.close()
+        _log_file_handler = None
+
+@lru_cache(maxsize=None)
+def _mask_table(mask_char:str = '*') -> dict:
+    '''
+    Build (and cache) the translation table mapping ASCII digits to mask_char.
+    '''
+    return str.maketrans(dict.fromkeys('0123456789', mask_char))
+
+_MASK_TABLE = _mask_table('*')
+
+@lru_cache(maxsize=None)
+def _strip_table(symbols_to_preserve:tuple = config.SYMBOLS_TO_PRESERVE) -> dict:
+    '''
+    Build (and cache) the translation table deleting the preserved symbols.
+    '''
+    return str.maketrans('', '', ''.join(symbols_to_preserve))
+
 def mask_numeric_value(
     value,
     mask_char:str = '*',
@@ -88,23 +168,27 @@ def mask_numeric_value(
     if value_str == '' or not hide_values:
         return value_str
 
-    # Check if value is zero (preserve zeros with all symbols)
-    # Remove all symbols to check numeric value
-    numeric_only = value_str
-    for symbol in symbols_to_preserve:
-        numeric_only = numeric_only.replace(symbol, '')
-
-    try:
-        if float(numeric_only) == 0:
-            return value_str  # Keep original format for zeros
-    except ValueError:
-        pass
+    return _mask_impl(value_str, mask_char, tuple(symbols_to_preserve))
 
+@lru_cache(maxsize=4096)
+def _mask_impl(
+    value_str:str, mask_char:str, symbols_to_preserve:tuple
+) -> str:
+    '''
+    Mask a non-empty value string (cached, row counts repeat across steps).
+    '''
     # Mask all digits, preserve everything else (signs, commas, periods, %, spaces)
-    masked = ''.join(
-        mask_char if c.isdigit() else c
-        for c in value_str
-    )
+    masked = value_str.translate(_mask_table(mask_char))
+
+    # Nothing to mask (no digits, e.g. 'N/A'), skip the zero check
+    if masked == value_str:
+        return value_str
+
+    # Check if value is zero (preserve zeros with all symbols)
+    # Remove all symbols in one pass, zero when only '0' digits remain
+    numeric_only = value_str.translate(_strip_table(symbols_to_preserve))
+    if not numeric_only.lstrip('0'):
+        return value_str  # Keep original format for zeros
 
     return masked 
 
@@ -188,6 +272,12 @@ def plot_outlier(
     hide_values : bool
         Whether to hide numeric values on the plot.
     '''
+    import matplotlib.pyplot as plt
+    import matplotlib.gridspec as gridspec
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+    import seaborn as sns
+
     logger.info(f"Plotting outlier detection for '{name}' on column '{column}' for '{name}'")
 
     _, Q1, Q3, IQR, lower_bound, upper_bound = filter_iqr(
@@ -327,6 +417,8 @@ def pivot_and_remove_low_freq_stores(
     pd.DataFrame
         Filtered pivot table DataFrame.
     '''
+    import pandas as pd
+
     # validate column in dataframe
     required_columns = ['OP', 'Toko', 'Kode Zona', 'KM Master', 'KM Tempuh']
     for col in required_columns:
@@ -424,6 +516,40 @@ def get_diff_unique_stores(
 
     return tuple(set1 - set2)
 
+def _count_unique_rows(
+    df:pd.DataFrame, rows_unique:list
+) -> int:
+    '''
+    Count unique row combinations without materializing a deduplicated DataFrame.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Input DataFrame.
+    rows_unique : list
+        List of column names to consider for unique row counting.
+        Columns are expected to hold hashable scalar values.
+
+    Returns:
+    --------
+    int
+        Number of unique row combinations.
+    '''
+    import pandas as pd
+
+    rows_unique = list(rows_unique)
+
+    # single column: hash table pass over the column values, no DataFrame copy
+    if len(rows_unique) == 1:
+        return int(pd.unique(df[rows_unique[0]].values).shape[0])
+
+    # all numeric columns: one row-hash pass over the block, then unique hashes
+    # (object columns are hashed as strings, so 1 and "1" would collide)
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in df[rows_unique].dtypes):
+        return int(pd.unique(pd.util.hash_pandas_object(df[rows_unique], index=False).values).shape[0])
+
+    return int(df.groupby(rows_unique, sort=False, observed=True, dropna=False).ngroups)
+
 class DataTracker:
     def __init__(
         self, name:str = "DataTracker"
@@ -439,12 +565,16 @@ class DataTracker:
         # initialize data tracker 
         self.name = name
         self.start_rows = None
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
 
-        # initialize data storage
+        # initialize data storage (typed buffers for row counts and timestamps)
         self.steps = []
-        self.rows = []
-        self.timestamps = []
+        self.rows = array('q')
+        self.timestamps = array('d')
+
+        # running values of the last tracked step
+        self._prev_rows = None
+        self._last_ts = self.start_time
 
         logger.info(f"Initialized DataTracker for: [{self.name}]")
 
@@ -462,13 +592,13 @@ class DataTracker:
         step_name : str
             Name of the processing step.
         rows_unique : list, optional
-            List of column names to consider for unique row counting. 
+            List of column names (hashable scalar dtypes) to consider for unique row counting. 
             If None, total rows will be counted.
         '''
         # track data at each step
-        current_time = time.time()
+        current_time = time.perf_counter() # single monotonic read, reused for all timings below
         if rows_unique:
-            current_rows =  len(df[rows_unique].drop_duplicates())
+            current_rows = _count_unique_rows(df, rows_unique)
         else:
             current_rows = len(df)
 
@@ -477,16 +607,12 @@ class DataTracker:
             self.start_rows = current_rows
 
         # calculate elapsed time
-        if len(self.timestamps) > 0:
-            step_duration = current_time - self.timestamps[-1]
-        else:
-            step_duration = current_time - self.start_time
-        
+        step_duration = current_time - self._last_ts
         cumulative_time = current_time - self.start_time
 
         # calculate row change
-        if len(self.rows) > 0:
-            prev_rows = self.rows[-1]
+        if self._prev_rows is not None:
+            prev_rows = self._prev_rows
             change = current_rows - prev_rows
             change_pct = (change / prev_rows * 100) if prev_rows > 0 else 0
             retention_pct = (current_rows / self.start_rows * 100) if self.start_rows > 0 else 0
@@ -499,17 +625,22 @@ class DataTracker:
         self.steps.append(step_name)
         self.rows.append(current_rows)
         self.timestamps.append(current_time)
-
-        # hide values if configured
-        display_rows = mask_numeric_value(f"{current_rows:,}")
-        display_change = mask_numeric_value(f"{change:+,}")
-
-        # log progress
-        logger.info(
-            f"[{self.name}] Step: {step_name} | Counts: {display_rows} | "
-            f"Change: {display_change} ({change_pct:+.2f}%) | Retention: {retention_pct:.2f}% | "
-            f"Step Time: {step_duration:.2f}s | Cumulative Time: {cumulative_time:.2f}s"
-        )
+        self._prev_rows = current_rows
+        self._last_ts = current_time
+
+        # skip masking and formatting when INFO is filtered out
+        if logger.isEnabledFor(logging.INFO):
+            # hide values if configured
+            display_rows = mask_numeric_value(f"{current_rows:,}")
+            display_change = mask_numeric_value(f"{change:+,}")
+
+            # log progress
+            logger.info(
+                "[%s] Step: %s | Counts: %s | Change: %s (%+.2f%%) | Retention: %.2f%% | "
+                "Step Time: %.2fs | Cumulative Time: %.2fs",
+                self.name, step_name, display_rows, display_change, change_pct,
+                retention_pct, step_duration, cumulative_time
+            )
 
     def get_final_rows(self) -> int:
         '''
@@ -520,8 +651,8 @@ class DataTracker:
         int
             Final row count.
         '''
-        if self.rows:
-            return self.rows[-1]
+        if self._prev_rows is not None:
+            return self._prev_rows
         else:
             return 0
     
@@ -535,63 +666,71 @@ class DataTracker:
             Total execution time in seconds.
         '''
         if self.timestamps:
-            return self.timestamps[-1] - self.start_time
+            return self._last_ts - self.start_time
         else:
-            return time.time() - self.start_time
+            return time.perf_counter() - self.start_time
     
-    def summary(self) -> pd.DataFrame:
+    def summary(
+        self, hide_values:bool = config.HIDE_VALUES
+    ) -> pd.DataFrame:
         '''
         Generate a summary DataFrame of the tracked data processing steps.
 
+        Parameters:
+        -----------
+        hide_values : bool
+            Whether to hide numeric values in the summary.
+
         Returns:
         --------
         pd.DataFrame
             Summary DataFrame with step names, row counts, changes, retention percentages, and execution times.
         '''
+        import numpy as np
+        import pandas as pd
+
         if not self.steps:
             logger.warning(f"[{self.name}] no data tracked yet.")
             return pd.DataFrame()
         
+        # zero-copy views over the typed buffers
+        rows = np.frombuffer(self.rows, dtype=np.int64)
+        timestamps = np.frombuffer(self.timestamps, dtype=np.float64)
+
+        # calculate row changes
+        prev_rows = np.concatenate(([rows[0]], rows[:-1]))
+        change = rows - prev_rows
+        change_pct = np.divide(
+            change * 100.0, prev_rows,
+            out=np.zeros(len(rows), dtype=np.float64), where=prev_rows > 0
+        )
+        if self.start_rows > 0:
+            retained_pct = rows / self.start_rows * 100.0
+        else:
+            retained_pct = np.zeros(len(rows), dtype=np.float64)
+
         # calculate time
-        step_durations = []
-        for i in range(len(self.timestamps)):
-            if i == 0:
-                duration = self.timestamps[i] - self.start_time
-            else:
-                duration = self.timestamps[i] - self.timestamps[i-1]
-            step_durations.append(duration)
-        
-        cumulative_times = [t - self.start_time for t in self.timestamps]
+        step_durations = np.diff(timestamps, prepend=self.start_time)
+        cumulative_times = timestamps - self.start_time
+
+        # format counts, masking digits in one vectorized pass (zeros stay visible)
+        counts_str = pd.Series([f"{x:,}" for x in self.rows])
+        change_str = pd.Series([f"{x:+,}" for x in change.tolist()])
+        if hide_values:
+            counts_str = counts_str.where(rows == 0, counts_str.str.translate(_MASK_TABLE))
+            change_str = change_str.where(change == 0, change_str.str.translate(_MASK_TABLE))
 
         # recap data
         df_summary = pd.DataFrame({
             "Step": self.steps,
-            "Counts": self.rows,
-            "Change": [self.rows[i] - self.rows[i-1] if i > 0 else 0 for i in range(len(self.rows))],
-            "Change (%)": [
-                ((self.rows[i] - self.rows[i-1]) / self.rows[i-1] * 100) if i > 0 and self.rows[i-1] > 0 else 0 
-                for i in range(len(self.rows))
-            ],
-            "Retained (%)": [
-                (self.rows[i] / self.start_rows * 100) if self.start_rows > 0 else 0 
-                for i in range(len(self.rows))
-            ],
-            "Duration (s)": step_durations,
-            "Cumulative Time (s)": cumulative_times
+            "Counts": counts_str,
+            "Change": change_str,
+            "Change (%)": np.char.mod("%+.2f", change_pct),
+            "Retained (%)": np.char.mod("%.2f", retained_pct),
+            "Duration (s)": np.char.mod("%.2f", step_durations),
+            "Cumulative Time (s)": np.char.mod("%.2f", cumulative_times)
         })
 
-        # format dataframe
-        df_summary["Counts"] = df_summary["Counts"].apply(
-            lambda x: mask_numeric_value(f"{x:,}")
-        )
-        df_summary["Change"] = df_summary["Change"].apply(
-            lambda x: mask_numeric_value(f"{x:+,}")
-        )
-        df_summary["Change (%)"] = df_summary["Change (%)"].map("{:+.2f}".format)
-        df_summary["Retained (%)"] = df_summary["Retained (%)"].map("{:.2f}".format)
-        df_summary["Duration (s)"] = df_summary["Duration (s)"].map("{:.2f}".format)
-        df_summary["Cumulative Time (s)"] = df_summary["Cumulative Time (s)"].map("{:.2f}".format)
-
         logger.info(f"[{self.name}] DataTracker summary generated for {len(self.steps)} steps.")
         return df_summary
         
@@ -620,9 +759,10 @@ def result_summary(
         (validated_stores / total_stores * 100) if total_stores > 0 else 0
     )
 
-    total_rec_stores = (
-        sum(stores.get_final_rows() for stores in stores_result.values())
-    )
+    method_stores = {
+        method_name: tracker.get_final_rows() for method_name, tracker in stores_result.items()
+    }
+    total_rec_stores = sum(method_stores.values())
     total_rec_stores_pct = (
         (total_rec_stores / total_stores * 100) if total_stores > 0 else 0
     )
@@ -635,35 +775,41 @@ def result_summary(
     total_time = sum(tracker.get_total_time() for tracker in times_result.values())
 
     # console summary
-    BOLD = '\033[1m'
-    RESET = '\033[0m'
-    print(f"\n{BOLD} KM MASTER DISCREPANCY DETECTION SYSTEM SUMMARY {RESET}")
-    # store summary
-    print("\n" + "="*70)
-    print(f"{BOLD}EXECUTION STORE SUMMARY{RESET}")
-    print("="*70)
-    print(f"{'Total Analyzed Stores':<30}: {f"{mask_numeric_value(f"{total_stores:,}"):>8}"} stores")
-    print(f"{'Validated Stores':<30}: {f"{mask_numeric_value(f"{validated_stores:,}"):>8}"} stores ({validated_stores_pct:05.2f}%)")
-    print("\nRecommendations by Method:")
-    print("-"*70)
-    for method_name, tracker in stores_result.items():
-        method_stores = tracker.get_final_rows()
-        method_stores_pct = (
-            (method_stores / total_stores * 100) if total_stores > 0 else 0
-        )
-        print(f"{method_name:<30}: {f"{mask_numeric_value(f"{method_stores:,}"):>8}"} stores ({method_stores_pct:05.2f}%)")
-    print("-"*70)
-    print(f"{'Total Recommended Stores':<30}: {f"{mask_numeric_value(f"{total_rec_stores:,}"):>8}"} stores ({total_rec_stores_pct:05.2f}%)")
-    print(f"\n{'Unprocessed Stores':<30}: {f"{mask_numeric_value(f"{unprocessed_stores:,}"):>8}"} stores ({unprocessed_stores_pct:05.2f}%)")
-    # time summary
-    print("\n" + "="*70)
-    print(f"{BOLD}EXECUTION TIME SUMMARY{RESET}")
-    print("="*70)
-    for method_name, tracker in times_result.items():
-        method_time = tracker.get_total_time()
-        print(f"{method_name:<30}: {method_time:>8.2f} secs")
-    print("-"*70)
-    print(f"{'Total Execution Time':<30}: {total_time:>8.2f} secs ({total_time/60:05.2f} mins)\n")
+    out = [
+        f"\n{_BOLD} KM MASTER DISCREPANCY DETECTION SYSTEM SUMMARY {_RESET}",
+        # store summary
+        f"\n{_EQ}",
+        f"{_BOLD}EXECUTION STORE SUMMARY{_RESET}",
+        _EQ,
+        f"{'Total Analyzed Stores':<30}: {mask_numeric_value(f'{total_stores:,}'):>8} stores",
+        f"{'Validated Stores':<30}: {mask_numeric_value(f'{validated_stores:,}'):>8} stores ({validated_stores_pct:05.2f}%)",
+        "\nRecommendations by Method:",
+        _DASH,
+    ]
+    out += [
+        f"{method_name:<30}: {mask_numeric_value(f'{stores:,}'):>8} stores "
+        f"({(stores / total_stores * 100) if total_stores > 0 else 0:05.2f}%)"
+        for method_name, stores in method_stores.items()
+    ]
+    out += [
+        _DASH,
+        f"{'Total Recommended Stores':<30}: {mask_numeric_value(f'{total_rec_stores:,}'):>8} stores ({total_rec_stores_pct:05.2f}%)",
+        f"\n{'Unprocessed Stores':<30}: {mask_numeric_value(f'{unprocessed_stores:,}'):>8} stores ({unprocessed_stores_pct:05.2f}%)",
+        # time summary
+        f"\n{_EQ}",
+        f"{_BOLD}EXECUTION TIME SUMMARY{_RESET}",
+        _EQ,
+    ]
+    out += [
+        f"{method_name:<30}: {tracker.get_total_time():>8.2f} secs"
+        for method_name, tracker in times_result.items()
+    ]
+    out += [
+        _DASH,
+        f"{'Total Execution Time':<30}: {total_time:>8.2f} secs ({total_time/60:05.2f} mins)\n",
+    ]
+    # single write instead of one print per line
+    sys.stdout.write("\n".join(out) + "\n")
 
     logger.info(f"Displayed results summary: {mask_numeric_value(f'{total_stores:,}')} total stores, {mask_numeric_value(f'{validated_stores:,}')} validated stores, {mask_numeric_value(f'{total_rec_stores:,}')} recommended stores, {mask_numeric_value(f'{unprocessed_stores:,}')} unprocessed stores, total execution time {total_time:.2f} secs.")
 
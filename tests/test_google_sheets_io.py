@@ -0,0 +1,99 @@
+"""
+Tests for the preemptive access token refresh in google_sheets_io
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("gspread")
+pytest.importorskip("pandas")
+
+import config
+import google_sheets_io
+from google_sheets_io import PreemptiveCreds
+
+REFRESH_THRESHOLD = timedelta(seconds=config.TOKEN_REFRESH_THRESHOLD)
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class FakeCreds:
+    """
+    Minimal stand-in for service account credentials with controlled expiry/validity.
+    """
+    def __init__(self, expires_in:timedelta, valid:bool = True, refresh_delay:float = 0.0):
+        self.token = "old-token"
+        self.expiry = utcnow() + expires_in
+        self.valid = valid
+        self.refresh_delay = refresh_delay
+        self.refresh_calls = 0
+        self.refresh_threads = []
+
+    def refresh(self, request):
+        time.sleep(self.refresh_delay)
+        self.refresh_calls += 1
+        self.refresh_threads.append(threading.current_thread().name)
+        self.token = "new-token"
+        self.expiry = utcnow() + timedelta(hours=1)
+        self.valid = True
+
+    def apply(self, headers):
+        headers["authorization"] = f"Bearer {self.token}"
+
+
+@pytest.fixture(autouse=True)
+def no_transport(monkeypatch):
+    # avoid building a real HTTP transport for refresh requests
+    monkeypatch.setattr(google_sheets_io, "Request", lambda: object())
+
+
+def wait_for_background_refresh():
+    # the refresh executor has a single worker, so a no-op queued after the refresh finishes after it
+    google_sheets_io._refresh_executor.submit(lambda: None).result(timeout=5)
+
+
+def test_stale_token_refreshes_in_background_and_serves_current_token():
+    # still valid for google-auth, but inside the stale window ahead of REFRESH_THRESHOLD
+    creds = FakeCreds(expires_in=REFRESH_THRESHOLD + timedelta(seconds=30))
+    preemptive = PreemptiveCreds(creds, stale_window=60)
+
+    headers = preemptive.get_metadata()
+    wait_for_background_refresh()
+
+    assert headers == {"authorization": "Bearer old-token"}
+    assert creds.refresh_calls == 1
+    assert creds.refresh_threads[0].startswith("token-refresh")
+    assert preemptive.get_metadata() == {"authorization": "Bearer new-token"}
+
+
+def test_fresh_token_is_not_refreshed():
+    creds = FakeCreds(expires_in=timedelta(hours=1))
+    preemptive = PreemptiveCreds(creds, stale_window=60)
+
+    preemptive.get_metadata()
+    wait_for_background_refresh()
+
+    assert creds.refresh_calls == 0
+
+
+def test_invalid_token_is_refreshed_once_for_concurrent_callers():
+    creds = FakeCreds(expires_in=timedelta(0), valid=False, refresh_delay=0.05)
+    preemptive = PreemptiveCreds(creds, stale_window=60)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(preemptive.get_metadata()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert creds.refresh_calls == 1
+    assert all(headers == {"authorization": "Bearer new-token"} for headers in results)
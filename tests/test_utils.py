@@ -0,0 +1,27 @@
+"""
+Tests for unique row counting in utils
+"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from utils import _count_unique_rows
+
+
+@pytest.mark.parametrize("data, columns", [
+    # mixed int/str store codes as returned by get_all_records()
+    ({"OP": ["A", "A", "A"], "Toko": [1, "1", 2]}, ["OP", "Toko"]),
+    ({"Toko": [1, "1", 2, 2]}, ["Toko"]),
+    # None keys in object columns
+    ({"OP": ["A", "A", "A", "A"], "Toko": [1, None, None, "1"]}, ["OP", "Toko"]),
+    ({"Toko": ["1", None, None]}, ["Toko"]),
+    # NaN keys in numeric columns
+    ({"OP": [1, 1, 1, 2], "Toko": [1.0, np.nan, np.nan, np.nan]}, ["OP", "Toko"]),
+    ({"Toko": [1.0, np.nan, np.nan]}, ["Toko"]),
+])
+def test_count_unique_rows_matches_drop_duplicates(data, columns):
+    df = pd.DataFrame(data)
+
+    assert _count_unique_rows(df, columns) == len(df[columns].drop_duplicates())